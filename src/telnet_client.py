@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import functools
+import re
 import typing
 import logging
 import telnetlib3
@@ -9,9 +11,22 @@ import telnetlib3
 
 _LOGGER = logging.getLogger("audiocontrol_director_telnet")
 
+_ORD_A = ord('A')
+_ORD_a = ord('a')
+
+_ANALOG_RE = re.compile(r'Channel (\d+)-(\d+)$')
+_DIGITAL_PREFIX = 'Digital In '
+
+# name, #, power state, input, volume, bass, treble, eq, group, temp, sig. sense
+_ZONE_RE = re.compile(
+    r'^([^,]+), (\d+), ([^,]+), (MX\d+ & \d+), (\d+), '
+    r'-?\d+, -?\d+, [^,]+, (-?\d+), [^,]+, ([^,]+)$')
+
 class InputID:
     """Represents an input, which can be either an analog stereo input or a digital stereo input"""
 
+    __slots__ = ('_pretty_name', '_status_name', '_protocol_name', '_is_analog')
+
     def __init__(self):
         self._pretty_name = ''
         self._status_name = ''
@@ -20,6 +35,16 @@ class InputID:
 
     @classmethod
     def create_analog(cls, index: int) -> InputID:
+        return cls._make_analog(index)
+    
+    @classmethod
+    def create_digital(cls, index: int, num_analog: int) -> InputID:
+        return cls._make_digital(index, num_analog)
+
+    # InputID is read-only once built, so identical inputs can share one instance
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _make_analog(index: int) -> InputID:
         instance = InputID()
         c2 = index*2
         c1 = c2-1
@@ -28,29 +53,28 @@ class InputID:
         instance._status_name = f'MX{index} & {index}'
         instance._protocol_name = f'MX{index}'
         return instance
-    
-    @classmethod
-    def create_digital(cls, index: int, num_analog: int) -> InputID:
-        c = chr(ord('a') + index - 1)
-        bigc = chr(ord('A') + index - 1)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _make_digital(index: int, num_analog: int) -> InputID:
         c1 = num_analog + index
         instance = InputID()
-        instance._pretty_name = f'Digital In {bigc}'
+        instance._pretty_name = f'Digital In {chr(_ORD_A + index - 1)}'
         instance._status_name = f'MX{c1} & {c1}'
-        instance._protocol_name = f'DX{c}' 
+        instance._protocol_name = f'DX{chr(_ORD_a + index - 1)}'
         return instance
     
     @classmethod
-    def create_from_pretty_name(cls, name: int, num_analog: int) -> InputID:
-        name_parts = name.split(' ')
-        print(name_parts[0])
-        if name_parts[0] == "Channel":
-            channels = name_parts[1].split('-')
-            return InputID.create_analog((int(channels[0]) // 2) + 1)
-        elif name_parts[0] == "Digital":
-            return InputID.create_digital(ord(name_parts[2]) - ord('A') + 1, num_analog)
+    def create_from_pretty_name(cls, name: str, num_analog: int) -> InputID | None:
+        if name.startswith('Channel '):
+            match = _ANALOG_RE.match(name)
+            if match is None:
+                return None
+            return InputID.create_analog((int(match.group(1)) // 2) + 1)
+        elif name.startswith(_DIGITAL_PREFIX):
+            return InputID.create_digital(ord(name[-1]) - _ORD_A + 1, num_analog)
         else:
-            return False
+            return None
 
     @classmethod
     def create_from_status_id(cls, status_name: str, num_analog: int) -> InputID:
@@ -81,33 +105,26 @@ class InputID:
         return self._is_analog
     
     def __str__(self) -> str:
-        return self.protocol_name
-\
-    def __add__(self, other: str) -> str:
-        return str(self) + other
-
-    def __radd__(self, other: str) -> str:
-        return other + str(self)
+        return self._protocol_name
 
 
 class OutputID:
     """Represents an output, which can be either an analog stereo amplifier
         zone or a a digital stereo output"""
 
+    __slots__ = ('_zone_id', '_group_id', '_digital_id', '_str', '_op_str')
+
     def __init__(self):
         self._zone_id = 0
         self._group_id = 0
         self._digital_id = ""
+        self._str = 'Z0'
+        self._op_str = 'Z0'
 
     @classmethod
     def all(cls) -> typing.List[OutputID]:
         """Returns list of all output options"""
-        return_list = []
-        for i in range(1, 8):
-            return_list.append(OutputID.create(i, 0, ""))
-        return_list.append(OutputID.create(9, 0, "a"))
-        return_list.append(OutputID.create(10, 0, "b"))
-        return return_list
+        return list(_ALL_OUTPUTS)
 
     @classmethod
     def create(cls, zone_id: int, group_id: int, digital_id: str) -> OutputID:
@@ -116,11 +133,20 @@ class OutputID:
         instance._zone_id = zone_id
         instance._group_id = group_id
         instance._digital_id = digital_id
+        # protocol strings are used in every command, so build them once
+        instance._str = f'Z{zone_id}' if not digital_id else f'DXO{digital_id}'
+        instance._op_str = f'GRP{group_id}' if group_id > 0 else instance._str
         return instance
 
     @classmethod
-    def create_from_status_id(cls, status_id: str, group_id: str, name: str) -> OutputID:
-        """Create instance from status ID string"""
+    def create_from_status_id(
+        cls,
+        status_id: str | int,
+        group_id: str | int,
+        name: str
+    ) -> OutputID:
+        """Create instance from status ID string, or from already parsed
+            status and group IDs"""
         if name[0:10] == "Digital Out":
             digital_id = name[12].lower()
         else:
@@ -135,25 +161,23 @@ class OutputID:
         return f'Digital Out {self._digital_id.upper()}'
 
     def __str__(self) -> str:
-        if self._digital_id == "":
-            return f'Z{self._zone_id}'
-        return f'DXO{self._digital_id}'
+        return self._str
 
     def op_str(self) -> str:
-        if self._group_id > 0:
-            return f'GRP{self._group_id}'
-        return str(self)
+        return self._op_str
 
-    def __add__(self, other: str) -> str:
-        return str(self) + other
 
-    def __radd__(self, other: str) -> str:
-        return other + str(self)
+_ALL_OUTPUTS = tuple(
+    [OutputID.create(i, 0, "") for i in range(1, 8)]
+    + [OutputID.create(9, 0, "a"), OutputID.create(10, 0, "b")])
 
 
 class OutputStatus:
     """Represents the status of an analog zone or digital output"""
 
+    __slots__ = ('_output_id', '_name', '_input_id', '_is_on', '_volume',
+                 '_is_signal_sense_on', '_group_id')
+
     def __init__(
         self,
         output_id: OutputID,
@@ -206,6 +230,8 @@ class OutputStatus:
 class SystemStatus:
     """Represents the status of a Director and its outputs"""
 
+    __slots__ = ('_name', '_outputs', '_inputs', '_input_names')
+
     def __init__(
         self,
         name: str,
@@ -237,6 +263,109 @@ class SystemStatus:
         return self._input_names
 
 
+def _parse_inputs(
+    raw_result: str
+) -> tuple[typing.Dict[str, InputID], typing.List[str], int]:
+    """Parses the raw INPUT? result into inputs by name, input names in
+        order and the number of analog inputs."""
+    inputs: typing.Dict[str, InputID] = {}
+    input_names: typing.List[str] = []
+    result_lines = raw_result.splitlines()
+
+    num_analog = 0
+    for result_line in result_lines:
+        fields = result_line.split(': ')
+        if len(fields) < 2:
+            break
+
+        name = fields[0]
+        input_id = InputID.create_from_pretty_name(name, num_analog)
+        if input_id is not None:
+            if input_id.is_analog:
+                num_analog += 1
+            inputs[name] = input_id
+            input_names.append(name)
+
+    return inputs, input_names, num_analog
+
+
+def _parse_outputs(
+    raw_result: str,
+    num_analog: int
+) -> tuple[str, typing.Dict[str, OutputStatus]]:
+    """Parses the raw SYSTEMstat? result into the system name and output
+        statuses by output ID strings."""
+    result_lines = raw_result.splitlines()
+
+    # ------------------------------
+    # Response format is as follows:
+    # ------------------------------
+    # pylint: disable=trailing-whitespace
+    # ------------------------------
+
+    # AMPLIFIER NAME: Director Matrix 6800 #3
+    # GLOBAL TEMP: 111 F & Normal
+    # GLOBAL VOLTAGE: 126 & Normal
+    # ZONE OUTPUT PROTECT:
+    # GLOBAL PROTECTION: Normal
+    # THERMAL PROTECTION: Normal
+    # IP ADDRESS: 10.111.16.52
+    # DATE 10/10/2022
+    # TIME '17:30:08
+    #
+    # ZONES, #, POWER STATE, INPUT, VOLUME, BASS, TREBLE, EQ, GROUP, TEMP, SIG. SENSE
+    # Zone 1, 1, on, MX1 & 1, 100, 0, 0, Acoustic and 0, 0, 111 F/Normal, off
+    # Zone 2, 2, on, MX2 & 2, 100, 0, 0, Acoustic and 0, 0, 111 F/Normal, off
+    # Zone 3, 3, on, MX3 & 3, 100, 0, 0, User 3 and 5, 0, 113 F/Normal, off
+    # Zone 4, 4, on, MX4 & 4, 100, 0, 0, unsaved values and -1, 0, 113 F/Normal, off
+    # Zone 5, 5, on, MX5 & 5, 100, 0, 0, User 3 and 5, 0, 113 F/Normal, off
+    # Zone 6, 6, on, MX6 & 6, 100, 0, 0, User 3 and 5, 0, 113 F/Normal, off
+    # Zone 7, 7, on, MX7 & 7, 100, 0, 0, Party and 2, 0, 109 F/Normal, off
+    # Zone 8, 8, on, MX8 & 8, 100, 0, 0, Party and 2, 0, 109 F/Normal, off
+    # Digital Out A, 9, on, MX10 & 10, 100, 0, 0, unsaved values and -1, 0, 0 F/Low, off
+    # Digital Out B, 10, on, MX10 & 10, 100, 0, 0, unsaved values and -1, 0, 0 F/Low, off
+
+    # ------------------------------
+    # pylint: enable=trailing-whitespace
+    # ------------------------------
+
+    # get the line that represents the name of the device
+    system_name_line = result_lines[0] if result_lines else ''
+    if not system_name_line.startswith('AMPLIFIER NAME: '):
+        raise Exception(f'Received unexpected response; \
+            first line was not amplifier name; got: {system_name_line}')
+    system_name = system_name_line.removeprefix('AMPLIFIER NAME: ')
+    # system_is_on = system_power_line.
+
+    # get the lines that represent the comma-separated data for each analog zone/digital output
+    outputs: typing.Dict[str, OutputStatus] = {}
+    output_lines = result_lines[11:]
+    for result_line in output_lines:
+        match = _ZONE_RE.match(result_line)
+        if match is None:
+            break
+
+        # bass, treble, eq and temperature are matched but not captured
+        name, status_id, power, raw_input_id, raw_volume, raw_group_id, sense = \
+            match.groups()
+
+        volume = int(raw_volume)
+        group_id = int(raw_group_id)
+
+        output_id = OutputID.create_from_status_id(int(status_id), group_id, name)
+
+        is_on = power == 'on'
+
+        input_id = InputID.create_from_status_id(raw_input_id, num_analog)
+
+        is_signal_sense_on = sense == 'on'
+        output = OutputStatus(
+            output_id, name, input_id, is_on, volume, is_signal_sense_on, group_id)
+        outputs[str(output_id)] = output
+
+    return system_name, outputs
+
+
 class TelnetClient:
     """Represents a client for communicating with the telnet server of an
         AudioControl Director M6400/M6800."""
@@ -265,23 +394,37 @@ class TelnetClient:
     ) -> str:
         """Sends given command to the server. Automatically appends
             CR to the command string."""
-        if command != "SYSTEMstat?" and command != "INPUT?":
-            _LOGGER.debug(command)
-        self._writer.write(command + '\r')
+        return await self._async_send_commands([command], min_line_count)
+
+    async def _async_send_commands(
+        self,
+        commands: typing.List[str],
+        min_line_count: int
+    ) -> str:
+        """Sends given commands to the server in one batch, draining the
+            writer once. Automatically appends CR to each command string.
+            Waits for min_line_count lines per command and returns the
+            combined raw response to all of the commands."""
+        if not commands:
+            return ''
+        for command in commands:
+            if command != "SYSTEMstat?" and command != "INPUT?":
+                _LOGGER.debug(command)
+            self._writer.write(command + '\r')
         await self._writer.drain()
 
-        empty_bytes = ''
-        result = ''
+        total_line_count = min_line_count * len(commands)
+        parts: list[str] = []
         line_count = 0
         while True:
             partial_result = await self._reader.read(4096)
-            if partial_result == empty_bytes:
+            if not partial_result:
                 break
-            result += partial_result
-            line_count += len(partial_result.split('\n')) - 1
-            if line_count >= min_line_count:
+            parts.append(partial_result)
+            line_count += partial_result.count('\n')
+            if line_count >= total_line_count:
                 break
-        return result
+        return ''.join(parts)
 
     @staticmethod
     def _interpret_result(
@@ -292,21 +435,22 @@ class TelnetClient:
         """Parses the response for errors or successes, with results."""
         succeeded = False
 
-        response_parts = response.split('\r', 1)
+        command_echo, separator, result = response.partition('\r')
 
         # response should start with echo of command; anything else is unexpected
-        command_echo = response_parts[0]
         if command_echo != command:
             raise Exception(f'Received unexpected response; \
                 first line was not echo of command; got: {command_echo}')
+        if not separator:
+            raise Exception(f'Received unexpected response; \
+                no result followed echo of command: {command_echo}')
 
         # remainder of the response is the result of the command
-        result = response_parts[1]
-        if result == f'xx{command}xx\r':
+        if result.startswith('xx') and result == f'xx{command}xx\r':
             # this is a "bad command" response
             raise BadCommandError(
                 f'Received "bad command" response: xx{command}xx')
-        if result == f'01{command}\r':
+        if result.startswith('01') and result == f'01{command}\r':
             # this is a "success" response
             succeeded = True
         if expect_success_code:
@@ -323,6 +467,18 @@ class TelnetClient:
         command = f'{output_arg}source{input_id}'
         await self._async_send_command(command, 1)
 
+    async def async_map_input_to_outputs(
+        self,
+        input_id: InputID,
+        output_ids: typing.List[OutputID]
+    ) -> None:
+        """Maps an input (analog input/digital input) to several outputs
+            (analog zones/digital outputs) in a single batch"""
+        # outputs in the same group share one GRPn command, so send it once
+        output_args = dict.fromkeys(output_id.op_str() for output_id in output_ids)
+        commands = [f'{output_arg}source{input_id}' for output_arg in output_args]
+        await self._async_send_commands(commands, 1)
+
     async def async_set_output_power_state(self, output_id: OutputID, state: bool) -> None:
         """Sets an outputs power state to on (True) or off (False)"""
         state_string = 'on' if state else 'off'
@@ -349,96 +505,10 @@ class TelnetClient:
         return self._interpret_result(command, result, False)[1]
 
     async def async_get_system_status(self) -> SystemStatus:
-        
-        inputs = {}
-        input_names = []
-        raw_result = await self.async_get_input_raw()
-        result_lines = raw_result.split('\r\n')
-
-        num_analog = 0
-        for result_line in result_lines:
-            fields = result_line.split(': ')
-            if len(fields) < 2:
-                break
-
-            name = fields[0]
-            input_id = InputID.create_from_pretty_name(name, num_analog)
-            if input_id != False:
-                if input_id.is_analog:
-                    num_analog += 1
-                inputs[name] = input_id
-                input_names.append(name)
-
-        raw_result = await self.async_get_system_status_raw()
-        result_lines = raw_result.split('\r\n')
-
-        # ------------------------------
-        # Response format is as follows:
-        # ------------------------------
-        # pylint: disable=trailing-whitespace
-        # ------------------------------
-
-        # AMPLIFIER NAME: Director Matrix 6800 #3
-        # GLOBAL TEMP: 111 F & Normal
-        # GLOBAL VOLTAGE: 126 & Normal
-        # ZONE OUTPUT PROTECT:
-        # GLOBAL PROTECTION: Normal
-        # THERMAL PROTECTION: Normal
-        # IP ADDRESS: 10.111.16.52
-        # DATE 10/10/2022
-        # TIME '17:30:08
-        #
-        # ZONES, #, POWER STATE, INPUT, VOLUME, BASS, TREBLE, EQ, GROUP, TEMP, SIG. SENSE
-        # Zone 1, 1, on, MX1 & 1, 100, 0, 0, Acoustic and 0, 0, 111 F/Normal, off
-        # Zone 2, 2, on, MX2 & 2, 100, 0, 0, Acoustic and 0, 0, 111 F/Normal, off
-        # Zone 3, 3, on, MX3 & 3, 100, 0, 0, User 3 and 5, 0, 113 F/Normal, off
-        # Zone 4, 4, on, MX4 & 4, 100, 0, 0, unsaved values and -1, 0, 113 F/Normal, off
-        # Zone 5, 5, on, MX5 & 5, 100, 0, 0, User 3 and 5, 0, 113 F/Normal, off
-        # Zone 6, 6, on, MX6 & 6, 100, 0, 0, User 3 and 5, 0, 113 F/Normal, off
-        # Zone 7, 7, on, MX7 & 7, 100, 0, 0, Party and 2, 0, 109 F/Normal, off
-        # Zone 8, 8, on, MX8 & 8, 100, 0, 0, Party and 2, 0, 109 F/Normal, off
-        # Digital Out A, 9, on, MX10 & 10, 100, 0, 0, unsaved values and -1, 0, 0 F/Low, off
-        # Digital Out B, 10, on, MX10 & 10, 100, 0, 0, unsaved values and -1, 0, 0 F/Low, off
-
-        # ------------------------------
-        # pylint: enable=trailing-whitespace
-        # ------------------------------
-
-        # get the line that represents the name of the device
-        system_name_line = result_lines[0]
-        system_name = system_name_line.split('AMPLIFIER NAME: ')[1]
-        # system_is_on = system_power_line.
-
-        # get the lines that represent the comma-separated data for each analog zone/digital output
-        outputs = {}
-        output_lines = result_lines[11:]
-        for result_line in output_lines:
-            fields = result_line.split(', ')
-            if len(fields) < 11:
-                break
-
-            name = fields[0]
-
-            output_id = OutputID.create_from_status_id(fields[1], fields[8], name)
-
-            is_on = fields[2] == 'on'
-
-            raw_input_id = fields[3]
-            input_id = InputID.create_from_status_id(raw_input_id, num_analog)
-
-            volume = int(fields[4])
-
-            # bass = int(fields[5])
-            # treble = int(fields[6])
-            # eq = fields[7] # parse the "Acoustic and 0" format
-            group_id = int(fields[8])
-            # temperature = fields[9] # parse temp
-
-            is_signal_sense_on = fields[10] == 'on'
-            output = OutputStatus(
-                output_id, name, input_id, is_on, volume, is_signal_sense_on, group_id)
-            outputs[str(output_id)] = output
-
+        """Returns full system status, including inputs"""
+        inputs, input_names, num_analog = _parse_inputs(await self.async_get_input_raw())
+        system_name, outputs = _parse_outputs(
+            await self.async_get_system_status_raw(), num_analog)
         return SystemStatus(system_name, outputs, inputs, input_names)
 
 